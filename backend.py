@@ -272,7 +272,10 @@ async def load_graph_to_neo4j_if_enabled(graph_path: str, dataset_name: str):
         )
         
         if stats:
-            logger.info(f"✅ Neo4j load successful: {stats}")
+            if stats.get("failed_rows"):
+                logger.warning(f"⚠️  Neo4j load partial, {stats['failed_rows']} rows failed: {stats}")
+            else:
+                logger.info(f"✅ Neo4j load successful: {stats}")
             return stats
         else:
             logger.error("❌ Neo4j load failed (check connection and credentials)")
@@ -3,17 +3,364 @@
 Neo4j Graph Loader
 Loads knowledge graphs from output/graphs/{dataset_name}_new.json into Neo4j database
 """
+import atexit
+import csv
 import json
 import os
-from typing import Dict, List, Optional
-from neo4j import GraphDatabase
+import tempfile
+import threading
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from neo4j import Driver, GraphDatabase
 from utils.logger import logger
 
+# ijson is optional - without it graph files are always parsed whole
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# orjson is optional - a faster drop-in for json.load when a file is parsed whole
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Write queries are module constants with every variable part passed as a parameter, so the
+# query text is identical across batches and Neo4j's plan cache is hit after the first one.
+# Each starts with _UNWIND_ROWS; the remainder is the per-row action used by apoc.periodic.iterate.
+_UNWIND_ROWS = "UNWIND $rows AS row\n"
+
+_MERGE_NAMED_NODE_CYPHER = _UNWIND_ROWS + """
+MERGE (n:Entity {name: row.name, dataset: $dataset})
+ON CREATE SET n.type = row.type
+SET n += row.props
+"""
+
+# Name-only nodes skip the property write (and its lock and log entry) entirely
+_MERGE_BARE_NAMED_NODE_CYPHER = _UNWIND_ROWS + """
+MERGE (n:Entity {name: row.name, dataset: $dataset})
+ON CREATE SET n.type = row.type
+"""
+
+_MERGE_NAMED_REL_CYPHER = _UNWIND_ROWS + """
+MATCH (a:Entity {name: row.s, dataset: $dataset})
+MATCH (b:Entity {name: row.t, dataset: $dataset})
+MERGE (a)-[r:RELATES {type: row.rel, dataset: $dataset}]->(b)
+"""
+
+_MERGE_ID_NODE_CYPHER = _UNWIND_ROWS + """
+MERGE (n:Entity {id: row.id, dataset: $dataset})
+SET n.name = row.name, n.type = row.type, n.attributes = row.attributes
+"""
+
+_MERGE_ID_REL_CYPHER = _UNWIND_ROWS + """
+MATCH (a:Entity {id: row.source, dataset: $dataset})
+MATCH (b:Entity {id: row.target, dataset: $dataset})
+MERGE (a)-[r:RELATES {type: row.relation, dataset: $dataset}]->(b)
+SET r.weight = row.weight
+"""
+
+_APOC_ITERATE_CYPHER = """
+CALL apoc.periodic.iterate(
+    "UNWIND $rows AS row RETURN row",
+    $action,
+    {batchSize: $batch_size, parallel: false, params: {rows: $rows, dataset: $dataset}}
+)
+YIELD failedBatches, failedOperations, errorMessages, updateStatistics
+RETURN failedBatches, failedOperations, errorMessages, updateStatistics
+"""
+
+_CLEAR_DATASET_CYPHER = """
+MATCH (n:Entity {dataset: $dataset})
+CALL {
+    WITH n
+    DETACH DELETE n
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+# Bulk path for the standard format: CSVs written into the server's import directory are read
+# with LOAD CSV and committed server-side in chunks. Every CSV field arrives as a string, so each
+# value carries a *_type column and is converted back, keeping the stored types the same as the
+# UNWIND path. Attributes are joined with the ASCII unit separator because CSV cannot carry lists
+_CSV_ATTRIBUTE_SEPARATOR = "\x1f"
+
+
+def _csv_typed(field: str, type_field: str) -> str:
+    """Cypher expression turning a CSV text field back into the type named by type_field"""
+    return (
+        f"CASE {type_field} WHEN 'null' THEN null WHEN 'int' THEN toInteger({field}) "
+        f"WHEN 'float' THEN toFloat({field}) WHEN 'bool' THEN toBoolean({field}) "
+        f"ELSE coalesce({field}, '') END"
+    )
+
+
+_LOAD_CSV_ID_NODE_CYPHER = f"""
+LOAD CSV WITH HEADERS FROM $url AS row
+CALL {{
+    WITH row
+    MERGE (n:Entity {{id: {_csv_typed("row.id", "row.id_type")}, dataset: $dataset}})
+    SET n.name = {_csv_typed("row.name", "row.name_type")},
+        n.type = {_csv_typed("row.type", "row.type_type")},
+        n.attributes = CASE row.attributes_type WHEN 'empty' THEN [] ELSE [
+            value IN split(coalesce(row.attributes, ''), $separator) |
+            {_csv_typed("value", "row.attributes_type")}
+        ] END
+}} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+_LOAD_CSV_ID_REL_CYPHER = f"""
+LOAD CSV WITH HEADERS FROM $url AS row
+CALL {{
+    WITH row
+    MATCH (a:Entity {{id: {_csv_typed("row.source", "row.source_type")}, dataset: $dataset}})
+    MATCH (b:Entity {{id: {_csv_typed("row.target", "row.target_type")}, dataset: $dataset}})
+    MERGE (a)-[r:RELATES {{type: {_csv_typed("row.relation", "row.relation_type")}, dataset: $dataset}}]->(b)
+    SET r.weight = {_csv_typed("row.weight", "row.weight_type")}
+}} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+# Drivers are shared per (uri, user, password) so repeated loads reuse one connection pool
+# instead of paying a fresh handshake each time; they are closed at interpreter exit
+_DRIVER_CACHE: Dict[Tuple[str, str, str], Driver] = {}
+_DRIVER_CACHE_LOCK = threading.Lock()
+
+
+def close_cached_drivers():
+    """Close every shared Neo4j driver"""
+    with _DRIVER_CACHE_LOCK:
+        drivers = list(_DRIVER_CACHE.values())
+        _DRIVER_CACHE.clear()
+    for driver in drivers:
+        try:
+            driver.close()
+        except Exception as e:
+            logger.warning(f"Error closing Neo4j driver: {e}")
+
+
+atexit.register(close_cached_drivers)
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _config_value(explicit, env_name: str, cast: Callable, default):
+    """Resolve a driver setting: explicit argument, then environment variable, then default"""
+    if explicit is not None:
+        return explicit
+    raw = os.getenv(env_name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        logger.warning(f"Ignoring invalid {env_name}={raw!r}, using default {default}")
+        return default
+
+
+def _read_json(graph_path: str):
+    """Parse a whole JSON file, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        with open(graph_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(graph_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _lock_order(source, target) -> Tuple[str, str]:
+    """Endpoint pair in a fixed order, so (A, B) and (B, A) sort and shard identically"""
+    source, target = str(source), str(target)
+    return (source, target) if source <= target else (target, source)
+
+
+def _write_csv(path: str, header: Tuple[str, ...], rows: Iterable[Tuple]) -> int:
+    """Stream rows into a CSV file with a header line; returns the number of data rows"""
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _reserve_csv(directory: str, kind: str) -> str:
+    """Create an empty, uniquely named CSV in directory and return its path"""
+    fd, path = tempfile.mkstemp(prefix=f"graphrag_{kind}_", suffix=".csv", dir=directory)
+    os.close(fd)
+    # mkstemp creates the file owner-only; the Neo4j server usually runs as another user
+    os.chmod(path, 0o644)
+    return path
+
+
+def _attribute_text(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def _csv_type(value) -> str:
+    """Name the primitive type of a value so LOAD CSV can convert its text back"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "str"
+
+
+def _csv_field(value) -> Tuple[str, str]:
+    """A value as (text, type) CSV columns; JSON text keeps NaN/Infinity readable by toFloat"""
+    return ("" if value is None else _attribute_text(value)), _csv_type(value)
+
+
+def _count_items(items: Iterable) -> int:
+    """Count items without materialising them (a streaming pass for _JsonItems)"""
+    return len(items) if isinstance(items, list) else sum(1 for _ in items)
+
+
+def _validate_json(graph_path: str):
+    """Stream through the whole file so a truncated or corrupt one raises before any write"""
+    with open(graph_path, 'rb') as f:
+        for _ in ijson.basic_parse(f):
+            pass
+
+
+def _sniff_graph_format(graph_path: str) -> Optional[str]:
+    """Detect the graph format by streaming only as far as the top-level structure"""
+    with open(graph_path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix != "":
+                continue
+            if event == "start_array":
+                return "relationship_list"
+            if event == "map_key" and value == "nodes":
+                return "standard"
+            if event != "start_map" and event != "map_key":
+                return None
+    return None
+
+
+def _coerce_attr(value):
+    """Keep primitives as-is; serialise anything else (dicts, lists, None) to JSON text"""
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _coerce_attributes(attributes) -> List:
+    """
+    Turn a node's attributes into a homogeneous list of primitives, as Neo4j requires for arrays
+    
+    Nested values become JSON text; if the resulting items still mix types, all of them are
+    stored as text.
+    """
+    if attributes is None:
+        return []
+    if not isinstance(attributes, list):
+        attributes = [attributes]
+    
+    coerced = [_coerce_attr(value) for value in attributes]
+    if len({type(value) for value in coerced}) > 1:
+        coerced = [_attribute_text(value) for value in coerced]
+    return coerced
+
+
+def _coerce_property(value):
+    """Make one map value a valid Neo4j property: None unsets it, lists become arrays, maps JSON text"""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return _coerce_attributes(value)
+    return _coerce_attr(value)
+
+
+def _is_name(value) -> bool:
+    """Relationship endpoint names must be non-empty strings or integers (hashable MERGE keys)"""
+    return bool(value) and isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def _flatten_relationship(item) -> Optional[Dict]:
+    """
+    Flatten one GraphRAG relationship item into a compact row, or None if it is malformed
+    
+    Keys: s/t (start/end name), st/et (start/end type), sp/ep (start/end properties), rel.
+    Types, properties and the relation are coerced to valid Neo4j values, as for standard nodes.
+    """
+    try:
+        start_node = item["start_node"]
+        end_node = item["end_node"]
+        start_props = start_node["properties"]
+        end_props = end_node["properties"]
+        start_name = start_props["name"]
+        end_name = end_props["name"]
+    except (KeyError, TypeError):
+        return None
+    
+    if not _is_name(start_name) or not _is_name(end_name):
+        return None
+    
+    start_type = start_props["schema_type"] if "schema_type" in start_props else start_node.get("label", "Entity")
+    end_type = end_props["schema_type"] if "schema_type" in end_props else end_node.get("label", "Entity")
+    # relation is a MERGE key, where null is rejected, so it falls back to the default
+    relation = item.get("relation")
+    
+    return {
+        "s": start_name,
+        "t": end_name,
+        "st": _coerce_property(start_type),
+        "et": _coerce_property(end_type),
+        "sp": {key: _coerce_property(value) for key, value in start_props.items()},
+        "ep": {key: _coerce_property(value) for key, value in end_props.items()},
+        "rel": "RELATED_TO" if relation is None else _coerce_attr(relation)
+    }
+
+
+def _log_load_stats(nodes_created: int, relationships_created: int, failed_rows: int):
+    if failed_rows:
+        logger.warning(
+            f"⚠️  Partially loaded graph: {nodes_created} nodes, {relationships_created} relationships, "
+            f"{failed_rows} rows failed (edges to nodes in failed rows are missing too)"
+        )
+    else:
+        logger.info(f"✅ Loaded graph: {nodes_created} nodes, {relationships_created} relationships")
+
+
+class _JsonItems:
+    """Re-iterable stream of the items under an ijson prefix; each iteration re-reads the file"""
+    
+    def __init__(self, graph_path: str, prefix: str):
+        self.graph_path = graph_path
+        self.prefix = prefix
+    
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.graph_path, 'rb') as f:
+            yield from ijson.items(f, self.prefix, use_float=True)
+
 
 class Neo4jLoader:
     """Load knowledge graphs into Neo4j database"""
     
-    def __init__(self, uri: str, user: str, password: str, database: str = "neo4j"):
+    def __init__(self, uri: str, user: str, password: str, database: str = "neo4j",
+                 batch_size: int = 1000, batches_per_commit: int = 10, max_workers: int = 8,
+                 max_connection_pool_size: Optional[int] = None,
+                 connection_acquisition_timeout: Optional[float] = None,
+                 max_transaction_retry_time: Optional[float] = None,
+                 connection_timeout: Optional[float] = None,
+                 keep_alive: Optional[bool] = None,
+                 apoc_threshold: int = 100_000,
+                 stream_threshold_bytes: int = 256 * 1024 * 1024,
+                 fetch_size: int = 1000,
+                 csv_import_dir: Optional[str] = None,
+                 csv_threshold: int = 500_000,
+                 index_wait_timeout: int = 300):
         """
         Initialize Neo4j connection
         
@@ -22,60 +369,163 @@ class Neo4jLoader:
             user: Neo4j username
             password: Neo4j password
             database: Neo4j database name (default: neo4j)
+            batch_size: Rows sent per UNWIND query during ingestion (default: 1000)
+            batches_per_commit: UNWIND batches grouped into one transaction (default: 10)
+            max_workers: Concurrent writer sessions used during ingestion (default: 8)
+            max_connection_pool_size: Bolt pool size (env NEO4J_MAX_CONNECTION_POOL_SIZE,
+                default: max(50, max_workers * 4))
+            connection_acquisition_timeout: Seconds to wait for a pooled connection
+                (env NEO4J_CONNECTION_ACQUISITION_TIMEOUT, default: 60)
+            max_transaction_retry_time: Seconds execute_write keeps retrying transient errors
+                (env NEO4J_MAX_TRANSACTION_RETRY_TIME, default: 30)
+            connection_timeout: Seconds allowed to open a connection (env NEO4J_CONNECTION_TIMEOUT, default: 10)
+            keep_alive: Enable TCP keep-alive on connections (env NEO4J_KEEP_ALIVE, default: true)
+            apoc_threshold: Minimum rows in a pass before use_apoc switches to apoc.periodic.iterate
+                (default: 100000)
+            stream_threshold_bytes: Graph files at least this large are streamed with ijson
+                instead of parsed whole (default: 256 MiB)
+            fetch_size: Records pulled per Bolt round-trip for query results (default: 1000)
+            csv_import_dir: Local path of the Neo4j server's import directory (env NEO4J_IMPORT_DIR);
+                when set, standard-format graphs above csv_threshold rows are bulk-loaded with LOAD CSV
+            csv_threshold: Minimum nodes + edges before the LOAD CSV path is used (default: 500000)
+            index_wait_timeout: Seconds ensure_indexes waits for new indexes to come online (default: 300)
         """
         self.uri = uri
         self.user = user
         self.password = password
         self.database = database
+        self.batch_size = batch_size
+        self.batches_per_commit = batches_per_commit
+        self.max_workers = max_workers
+        self.max_connection_pool_size = _config_value(
+            max_connection_pool_size, "NEO4J_MAX_CONNECTION_POOL_SIZE", int, max(50, max_workers * 4)
+        )
+        self.connection_acquisition_timeout = _config_value(
+            connection_acquisition_timeout, "NEO4J_CONNECTION_ACQUISITION_TIMEOUT", float, 60.0
+        )
+        self.max_transaction_retry_time = _config_value(
+            max_transaction_retry_time, "NEO4J_MAX_TRANSACTION_RETRY_TIME", float, 30.0
+        )
+        self.connection_timeout = _config_value(connection_timeout, "NEO4J_CONNECTION_TIMEOUT", float, 10.0)
+        self.keep_alive = _config_value(keep_alive, "NEO4J_KEEP_ALIVE", _parse_bool, True)
+        self.apoc_threshold = apoc_threshold
+        self.stream_threshold_bytes = stream_threshold_bytes
+        self.fetch_size = fetch_size
+        self.csv_import_dir = _config_value(csv_import_dir, "NEO4J_IMPORT_DIR", str, None)
+        self.csv_threshold = csv_threshold
+        self.index_wait_timeout = index_wait_timeout
         self.driver = None
+        self._apoc_available = None
         
     def connect(self):
-        """Establish connection to Neo4j"""
+        """
+        Establish connection to Neo4j
+        
+        Reuses the shared driver for the same uri and credentials if one exists; pool
+        settings only take effect for the loader that creates it.
+        """
+        key = (self.uri, self.user, self.password)
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+            with _DRIVER_CACHE_LOCK:
+                driver = _DRIVER_CACHE.get(key)
+                if driver is None:
+                    driver = GraphDatabase.driver(
+                        self.uri,
+                        auth=(self.user, self.password),
+                        max_connection_pool_size=self.max_connection_pool_size,
+                        connection_acquisition_timeout=self.connection_acquisition_timeout,
+                        max_transaction_retry_time=self.max_transaction_retry_time,
+                        connection_timeout=self.connection_timeout,
+                        keep_alive=self.keep_alive
+                    )
+                    _DRIVER_CACHE[key] = driver
+            self.driver = driver
             # Test connection
-            with self.driver.session(database=self.database) as session:
-                session.run("RETURN 1")
+            with self._session() as session:
+                session.run("RETURN 1").consume()
             logger.info(f"✅ Connected to Neo4j at {self.uri}, database: {self.database}")
             return True
         except Exception as e:
             logger.error(f"❌ Failed to connect to Neo4j: {e}")
+            # The shared driver stays cached: other loaders may be using it, and it opens fresh
+            # connections on its own once the server is reachable again
+            self.driver = None
             return False
     
+    def _session(self):
+        """Open a session; results are streamed in fetch_size chunks rather than buffered whole"""
+        return self.driver.session(database=self.database, fetch_size=self.fetch_size)
+    
     def close(self):
-        """Close Neo4j connection"""
+        """Release this loader's handle; the shared driver stays open for reuse until exit"""
         if self.driver:
-            self.driver.close()
-            logger.info("Neo4j connection closed")
+            self.driver = None
+            logger.info("Neo4j connection released")
     
     def clear_graph(self, dataset_name: str):
-        """Clear existing graph data for a dataset"""
+        """
+        Clear existing graph data for a dataset
+        
+        Matches on :Entity so the entity_dataset index turns the lookup into an index seek
+        (see ensure_indexes), and deletes in chunks so no single huge transaction is built.
+        """
         if not self.driver:
             raise RuntimeError("Neo4j driver not initialized. Call connect() first.")
         
         try:
-            with self.driver.session(database=self.database) as session:
-                # Delete all nodes and relationships with dataset label
-                session.run(
-                    "MATCH (n {dataset: $dataset}) DETACH DELETE n",
-                    dataset=dataset_name
-                )
-            logger.info(f"Cleared existing graph data for dataset: {dataset_name}")
+            # CALL {} IN TRANSACTIONS must run in an auto-commit transaction, hence session.run
+            with self._session() as session:
+                counters = session.run(_CLEAR_DATASET_CYPHER, dataset=dataset_name).consume().counters
+            logger.info(f"Cleared existing graph data for dataset: {dataset_name} ({counters.nodes_deleted} nodes)")
         except Exception as e:
             logger.error(f"Error clearing graph: {e}")
             raise
     
-    def load_graph_from_json(self, graph_path: str, dataset_name: str, clear_existing: bool = True) -> Dict:
+    def apoc_available(self) -> bool:
+        """Check (once per loader) whether the APOC apoc.periodic.iterate procedure is installed"""
+        if self._apoc_available is None:
+            try:
+                with self._session() as session:
+                    record = session.run(
+                        "SHOW PROCEDURES YIELD name WHERE name = 'apoc.periodic.iterate' RETURN count(*) AS n"
+                    ).single()
+                self._apoc_available = bool(record and record["n"])
+            except Exception as e:
+                logger.warning(f"Could not detect APOC procedures: {e}")
+                self._apoc_available = False
+            if not self._apoc_available:
+                logger.warning("APOC apoc.periodic.iterate not available, using client-side batching")
+        return self._apoc_available
+    
+    def ensure_indexes(self):
+        """Create the :Entity indexes that MERGE/MATCH during ingestion rely on"""
+        if not self.driver:
+            raise RuntimeError("Neo4j driver not initialized. Call connect() first.")
+        
+        with self._session() as session:
+            session.run("CREATE INDEX entity_id_ds IF NOT EXISTS FOR (n:Entity) ON (n.id, n.dataset)").consume()
+            session.run("CREATE INDEX entity_name_ds IF NOT EXISTS FOR (n:Entity) ON (n.name, n.dataset)").consume()
+            session.run("CREATE INDEX entity_dataset IF NOT EXISTS FOR (n:Entity) ON (n.dataset)").consume()
+            # CREATE INDEX returns before a new index is ONLINE; wait so ingest MERGEs can seek it
+            session.run("CALL db.awaitIndexes($timeout)", timeout=self.index_wait_timeout).consume()
+        logger.info("Ensured Neo4j indexes on :Entity(id, dataset), (name, dataset), (dataset)")
+    
+    def load_graph_from_json(self, graph_path: str, dataset_name: str, clear_existing: bool = True,
+                             use_apoc: bool = False) -> Dict:
         """
         Load graph from JSON file into Neo4j
         
         Args:
             graph_path: Path to the graph JSON file
             dataset_name: Name of the dataset
-            clear_existing: Whether to clear existing data for this dataset
+            clear_existing: Whether to clear existing data for this dataset (done only once the
+                file is known to parse)
+            use_apoc: Hand passes larger than apoc_threshold rows to apoc.periodic.iterate
+                so the server commits them in batches (requires the APOC plugin)
             
         Returns:
-            Dict with stats: nodes_created, relationships_created
+            Dict with stats: nodes_created, relationships_created, failed_rows (rows whose
+            transaction could not be committed; non-zero means the load is partial)
         """
         if not self.driver:
             raise RuntimeError("Neo4j driver not initialized. Call connect() first.")
@@ -83,23 +533,53 @@ class Neo4jLoader:
         if not os.path.exists(graph_path):
             raise FileNotFoundError(f"Graph file not found: {graph_path}")
         
-        # Load JSON
-        with open(graph_path, 'r', encoding='utf-8') as f:
-            graph_data = json.load(f)
+        # Indexes must exist before MERGE-heavy ingestion
+        self.ensure_indexes()
+        
+        # Large files are streamed with ijson so they never sit in memory whole; smaller ones
+        # are parsed in one go (orjson when available), which is several times faster
+        graph_data = None
+        if IJSON_AVAILABLE and os.path.getsize(graph_path) >= self.stream_threshold_bytes:
+            graph_format = _sniff_graph_format(graph_path)
+        else:
+            graph_data = _read_json(graph_path)
+            
+            if isinstance(graph_data, list):
+                graph_format = "relationship_list"
+            elif isinstance(graph_data, dict) and "nodes" in graph_data:
+                graph_format = "standard"
+            else:
+                graph_format = None
+        
+        if graph_format is None:
+            raise ValueError(f"Unknown graph format in {graph_path}")
+        
+        # Existing data is only cleared once the whole file is known to parse, so a truncated
+        # or corrupt file fails before anything is deleted
+        if graph_format == "relationship_list":
+            items = graph_data if graph_data is not None else _JsonItems(graph_path, "item")
+            return self._load_relationship_list_format(items, dataset_name, use_apoc, clear_existing)
         
-        # Clear existing data if requested
         if clear_existing:
+            if graph_data is None:
+                _validate_json(graph_path)
             self.clear_graph(dataset_name)
         
-        # Detect format and load
-        if isinstance(graph_data, list):
-            return self._load_relationship_list_format(graph_data, dataset_name)
-        elif isinstance(graph_data, dict) and "nodes" in graph_data:
-            return self._load_standard_format(graph_data, dataset_name)
+        if graph_data is not None:
+            nodes = graph_data.get("nodes", [])
+            edges = graph_data.get("edges", [])
         else:
-            raise ValueError(f"Unknown graph format in {graph_path}")
+            nodes = _JsonItems(graph_path, "nodes.item")
+            edges = _JsonItems(graph_path, "edges.item")
+        
+        if self.csv_import_dir:
+            stats = self._load_via_csv(nodes, edges, dataset_name)
+            if stats is not None:
+                return stats
+        return self._load_standard_format(nodes, edges, dataset_name, use_apoc)
     
-    def _load_relationship_list_format(self, graph_data: List[Dict], dataset_name: str) -> Dict:
+    def _load_relationship_list_format(self, graph_data: Iterable[Dict], dataset_name: str,
+                                       use_apoc: bool = False, clear_existing: bool = False) -> Dict:
         """
         Load GraphRAG format: list of relationships with start_node/end_node/relation
         
@@ -112,74 +592,87 @@ class Neo4jLoader:
           },
           ...
         ]
+        
+        With clear_existing, the dataset is cleared after the node pass has read all of
+        graph_data, so a stream that fails to parse leaves the existing data in place.
         """
-        nodes_created = 0
-        relationships_created = 0
+        logger.info("Loading relationships from GraphRAG format...")
         
-        logger.info(f"Loading {len(graph_data)} relationships from GraphRAG format...")
-        
-        with self.driver.session(database=self.database) as session:
-            for item in graph_data:
-                if not isinstance(item, dict):
-                    continue
-                
-                start_node = item.get("start_node", {})
-                end_node = item.get("end_node", {})
-                relation = item.get("relation", "RELATED_TO")
-                
-                # Extract node info
-                start_props = start_node.get("properties", {})
-                end_props = end_node.get("properties", {})
-                
-                start_name = start_props.get("name", "")
-                end_name = end_props.get("name", "")
-                
-                if not start_name or not end_name:
-                    continue
-                
-                # Get node types
-                start_type = start_props.get("schema_type", start_node.get("label", "Entity"))
-                end_type = end_props.get("schema_type", end_node.get("label", "Entity"))
-                
-                # Create nodes and relationship
-                try:
-                    result = session.run(
-                        """
-                        MERGE (a:Entity {name: $start_name, dataset: $dataset})
-                        ON CREATE SET a.type = $start_type, a += $start_props
-                        ON MATCH SET a += $start_props
-                        MERGE (b:Entity {name: $end_name, dataset: $dataset})
-                        ON CREATE SET b.type = $end_type, b += $end_props
-                        ON MATCH SET b += $end_props
-                        MERGE (a)-[r:RELATES {type: $relation, dataset: $dataset}]->(b)
-                        RETURN a, b, r
-                        """,
-                        start_name=start_name,
-                        end_name=end_name,
-                        dataset=dataset_name,
-                        start_type=start_type,
-                        end_type=end_type,
-                        start_props=start_props,
-                        end_props=end_props,
-                        relation=relation
-                    )
-                    
-                    if result.peek():
-                        nodes_created += 2  # approximation (may be merged)
-                        relationships_created += 1
-                        
-                except Exception as e:
-                    logger.warning(f"Error creating relationship: {e}")
-                    continue
-        
-        logger.info(f"✅ Loaded graph: ~{nodes_created} nodes, {relationships_created} relationships")
+        # Pass 1: every distinct endpoint is merged exactly once, instead of once per relationship
+        node_rows = self._unique_node_rows(graph_data)
+        if clear_existing:
+            self.clear_graph(dataset_name)
+        nodes_created, _, failed_rows = self._ingest_rows(
+            _MERGE_NAMED_NODE_CYPHER, [row for row in node_rows if row["props"]],
+            dataset_name, shard_key=lambda row: row["name"], use_apoc=use_apoc
+        )
+        bare_nodes_created, _, bare_failed_rows = self._ingest_rows(
+            _MERGE_BARE_NAMED_NODE_CYPHER, [row for row in node_rows if not row["props"]],
+            dataset_name, shard_key=lambda row: row["name"], use_apoc=use_apoc
+        )
+        nodes_created += bare_nodes_created
+        failed_rows += bare_failed_rows
+        
+        # Pass 2: endpoints already exist, so relationships only MATCH them.
+        # Shard and sort by the unordered endpoint pair so every worker locks nodes in the same order
+        edge_rows = ({"s": row["s"], "t": row["t"], "rel": row["rel"]} for row in self._relationship_rows(graph_data))
+        _, relationships_created, edge_failed_rows = self._ingest_rows(
+            _MERGE_NAMED_REL_CYPHER, edge_rows, dataset_name,
+            shard_key=lambda row: _lock_order(row["s"], row["t"])[0],
+            sort_key=lambda row: _lock_order(row["s"], row["t"]),
+            use_apoc=use_apoc
+        )
+        failed_rows += edge_failed_rows
+        
+        _log_load_stats(nodes_created, relationships_created, failed_rows)
         return {
             "nodes_created": nodes_created,
             "relationships_created": relationships_created,
+            "failed_rows": failed_rows,
             "format": "relationship_list"
         }
     
-    def _load_standard_format(self, graph_data: Dict, dataset_name: str) -> Dict:
+    def _relationship_rows(self, graph_data: Iterable[Dict], report: bool = False) -> Iterator[Dict]:
+        """Turn GraphRAG relationship items into compact rows, skipping malformed ones (counted if report)"""
+        invalid = 0
+        for item in graph_data:
+            row = _flatten_relationship(item)
+            if row is None:
+                invalid += 1
+                continue
+            yield row
+        
+        if report and invalid:
+            logger.warning(
+                f"Skipped {invalid} malformed relationships (missing endpoints, or a name that is "
+                "not a non-empty string/integer)"
+            )
+    
+    def _unique_node_rows(self, graph_data: Iterable[Dict]) -> List[Dict]:
+        """
+        Collect each relationship endpoint once, keyed by name
+        
+        Mirrors the per-row MERGE semantics: the first type seen wins and
+        properties from later occurrences are merged over earlier ones. The
+        name is dropped from props since MERGE already sets it, leaving props
+        empty for name-only entities.
+        """
+        nodes = {}
+        # Node pass reads the data first, so it reports skipped items; the edge pass skips the same ones
+        for row in self._relationship_rows(graph_data, report=True):
+            for name, node_type, props in ((row["s"], row["st"], row["sp"]), (row["t"], row["et"], row["ep"])):
+                node = nodes.get(name)
+                if node is None:
+                    nodes[name] = {"name": name, "type": node_type, "props": dict(props)}
+                else:
+                    node["props"].update(props)
+        
+        for node in nodes.values():
+            node["props"].pop("name", None)
+        return list(nodes.values())
+    
+    def _load_standard_format(self, nodes: Iterable[Dict], edges: Iterable[Dict], dataset_name: str,
+                              use_apoc: bool = False) -> Dict:
         """
         Load standard format: {nodes: [...], edges: [...]}
         
@@ -195,77 +688,281 @@ class Neo4jLoader:
           ]
         }
         """
-        nodes = graph_data.get("nodes", [])
-        edges = graph_data.get("edges", [])
+        logger.info("Loading nodes and edges from standard format...")
         
-        logger.info(f"Loading {len(nodes)} nodes and {len(edges)} edges from standard format...")
+        # Create nodes (all committed before any edge is matched against them)
+        # Shard by id: MERGE without a uniqueness constraint does not stop two concurrent
+        # transactions creating the same node, so duplicate ids must stay on one worker
+        nodes_created, _, failed_rows = self._ingest_rows(
+            _MERGE_ID_NODE_CYPHER, self._node_rows(nodes), dataset_name,
+            shard_key=lambda row: row["id"], use_apoc=use_apoc
+        )
         
-        nodes_created = 0
-        relationships_created = 0
+        # Create relationships, sharded and sorted by endpoint pair for a consistent lock order
+        _, relationships_created, edge_failed_rows = self._ingest_rows(
+            _MERGE_ID_REL_CYPHER, self._edge_rows(edges), dataset_name,
+            shard_key=lambda row: _lock_order(row["source"], row["target"])[0],
+            sort_key=lambda row: _lock_order(row["source"], row["target"]),
+            use_apoc=use_apoc
+        )
+        failed_rows += edge_failed_rows
         
-        with self.driver.session(database=self.database) as session:
-            # Create nodes
-            for node in nodes:
-                node_id = node.get("id", "")
-                name = node.get("name", node_id)
-                node_type = node.get("type", "Entity")
-                attributes = node.get("attributes", [])
-                
-                if not node_id:
-                    continue
-                
-                try:
-                    session.run(
-                        """
-                        MERGE (n:Entity {id: $id, dataset: $dataset})
-                        SET n.name = $name, n.type = $type, n.attributes = $attributes
-                        """,
-                        id=node_id,
-                        name=name,
-                        type=node_type,
-                        attributes=attributes,
-                        dataset=dataset_name
-                    )
-                    nodes_created += 1
-                except Exception as e:
-                    logger.warning(f"Error creating node {node_id}: {e}")
-                    continue
+        _log_load_stats(nodes_created, relationships_created, failed_rows)
+        return {
+            "nodes_created": nodes_created,
+            "relationships_created": relationships_created,
+            "failed_rows": failed_rows,
+            "format": "standard"
+        }
+    
+    def _load_via_csv(self, nodes: Iterable[Dict], edges: Iterable[Dict], dataset_name: str) -> Optional[Dict]:
+        """
+        Bulk-load standard format with LOAD CSV ... CALL {} IN TRANSACTIONS
+        
+        Graphs of at most csv_threshold items return None before anything is written, so the
+        caller falls back to UNWIND batching (nodes and edges must be re-iterable for that).
+        Larger ones are streamed into CSVs under csv_import_dir, then removed after the load.
+        
+        Returns:
+            Dict with load stats, or None when the graph is below the threshold
+        """
+        if _count_items(nodes) + _count_items(edges) <= self.csv_threshold:
+            return None
+        
+        # Files get unique generated names: dataset_name is never put into a path, and
+        # concurrent loads of the same dataset cannot overwrite each other's CSVs
+        node_path = edge_path = None
+        try:
+            node_path = _reserve_csv(self.csv_import_dir, "nodes")
+            edge_path = _reserve_csv(self.csv_import_dir, "edges")
+            node_count = _write_csv(
+                node_path,
+                ("id", "id_type", "name", "name_type", "type", "type_type", "attributes", "attributes_type"),
+                (
+                    # Attributes are homogeneous after coercion, so the first one types the list
+                    (*_csv_field(row["id"]), *_csv_field(row["name"]), *_csv_field(row["type"]),
+                     _CSV_ATTRIBUTE_SEPARATOR.join(map(_attribute_text, row["attributes"])),
+                     _csv_type(row["attributes"][0]) if row["attributes"] else "empty")
+                    for row in self._node_rows(nodes)
+                )
+            )
+            edge_count = _write_csv(
+                edge_path,
+                ("source", "source_type", "target", "target_type", "relation", "relation_type",
+                 "weight", "weight_type"),
+                (
+                    (*_csv_field(row["source"]), *_csv_field(row["target"]),
+                     *_csv_field(row["relation"]), *_csv_field(row["weight"]))
+                    for row in self._edge_rows(edges)
+                )
+            )
             
-            # Create relationships
-            for edge in edges:
-                source = edge.get("source", "")
-                target = edge.get("target", "")
-                relation = edge.get("relation", "RELATED_TO")
-                weight = edge.get("weight", 1.0)
-                
-                if not source or not target:
-                    continue
-                
-                try:
-                    session.run(
-                        """
-                        MATCH (a:Entity {id: $source, dataset: $dataset})
-                        MATCH (b:Entity {id: $target, dataset: $dataset})
-                        MERGE (a)-[r:RELATES {type: $relation, dataset: $dataset}]->(b)
-                        SET r.weight = $weight
-                        """,
-                        source=source,
-                        target=target,
-                        relation=relation,
-                        weight=weight,
-                        dataset=dataset_name
-                    )
-                    relationships_created += 1
-                except Exception as e:
-                    logger.warning(f"Error creating relationship {source}->{target}: {e}")
-                    continue
+            logger.info(f"Bulk-loading {node_count} nodes and {edge_count} edges via LOAD CSV...")
+            # CALL {} IN TRANSACTIONS must run in an auto-commit transaction, hence session.run
+            with self._session() as session:
+                nodes_created = session.run(
+                    _LOAD_CSV_ID_NODE_CYPHER,
+                    url=f"file:///{quote(os.path.basename(node_path))}",
+                    dataset=dataset_name,
+                    separator=_CSV_ATTRIBUTE_SEPARATOR
+                ).consume().counters.nodes_created
+                relationships_created = session.run(
+                    _LOAD_CSV_ID_REL_CYPHER,
+                    url=f"file:///{quote(os.path.basename(edge_path))}",
+                    dataset=dataset_name
+                ).consume().counters.relationships_created
+        finally:
+            for path in (node_path, edge_path):
+                if path and os.path.exists(path):
+                    os.remove(path)
         
         logger.info(f"✅ Loaded graph: {nodes_created} nodes, {relationships_created} relationships")
         return {
             "nodes_created": nodes_created,
             "relationships_created": relationships_created,
+            "failed_rows": 0,
             "format": "standard"
         }
+    
+    def _node_rows(self, nodes: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Turn standard-format nodes into UNWIND rows, skipping nodes without an id
+        
+        Values are coerced to valid Neo4j properties here, once, so a single bad node can
+        never make the server reject (and roll back) a whole batch. Nodes whose id is not
+        a string or integer are skipped and reported in one warning at the end.
+        """
+        invalid = 0
+        for node in nodes:
+            if not isinstance(node, dict):
+                invalid += 1
+                continue
+            
+            node_id = node.get("id", "")
+            name = node.get("name", node_id)
+            node_type = node.get("type", "Entity")
+            attributes = node.get("attributes", [])
+            
+            if not node_id:
+                continue
+            if not isinstance(node_id, (str, int)) or isinstance(node_id, bool):
+                invalid += 1
+                continue
+            
+            yield {
+                "id": node_id,
+                "name": name if name is None else _coerce_attr(name),
+                "type": node_type if node_type is None else _coerce_attr(node_type),
+                "attributes": _coerce_attributes(attributes)
+            }
+        
+        if invalid:
+            logger.warning(f"Skipped {invalid} malformed nodes (not an object, or id is not a string/integer)")
+    
+    def _edge_rows(self, edges: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Turn standard-format edges into UNWIND rows, skipping edges without endpoints
+        
+        relation and weight are coerced to valid Neo4j properties, as in _node_rows. Edges
+        that are not objects are skipped and reported in one warning at the end.
+        """
+        invalid = 0
+        for edge in edges:
+            if not isinstance(edge, dict):
+                invalid += 1
+                continue
+            
+            source = edge.get("source", "")
+            target = edge.get("target", "")
+            relation = edge.get("relation")
+            weight = edge.get("weight", 1.0)
+            
+            if not source or not target:
+                continue
+            
+            # relation is a MERGE key, where null is rejected, so it falls back to the default
+            yield {
+                "source": source,
+                "target": target,
+                "relation": "RELATED_TO" if relation is None else _coerce_attr(relation),
+                "weight": weight if weight is None else _coerce_attr(weight)
+            }
+        
+        if invalid:
+            logger.warning(f"Skipped {invalid} malformed edges (not an object)")
+    
+    def _ingest_rows(self, query: str, rows: Iterable[Dict], dataset_name: str,
+                     shard_key: Optional[Callable[[Dict], str]] = None,
+                     sort_key: Optional[Callable[[Dict], Tuple]] = None,
+                     use_apoc: bool = False) -> Tuple[int, int, int]:
+        """
+        Ingest rows through UNWIND batches written in parallel by a thread pool
+        
+        Rows are split into max_workers shards (by shard_key when given, round-robin
+        otherwise). Each shard keeps at most one transaction in flight, so rows that
+        share a shard key are never written concurrently. Any pass that MERGEs nodes
+        must shard by the MERGE key, since round-robin rows can race into duplicates.
+        With sort_key, each transaction writes its rows in sorted order so concurrent
+        workers acquire node locks in the same order instead of deadlocking and retrying.
+        
+        Args:
+            query: One of the module-level UNWIND Cypher constants
+            rows: Row dicts to ingest
+            dataset_name: Name of the dataset
+            shard_key: Optional function returning the key a row is sharded by
+            sort_key: Optional function ordering the rows within each transaction
+            use_apoc: Delegate to apoc.periodic.iterate when there are more than apoc_threshold rows
+            
+        Returns:
+            Tuple of (nodes_created, relationships_created, failed_rows); failed_rows counts
+            rows in transactions that could not be committed even after retries
+        """
+        if use_apoc:
+            rows = list(rows)
+            if len(rows) > self.apoc_threshold and self.apoc_available():
+                return self._ingest_rows_apoc(query, rows, dataset_name)
+        
+        workers = max(1, self.max_workers)
+        group_size = self.batch_size * self.batches_per_commit
+        buffers = [[] for _ in range(workers)]
+        inflight = [None] * workers
+        nodes_created = 0
+        relationships_created = 0
+        failed_rows = 0
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            def collect(future):
+                nonlocal nodes_created, relationships_created, failed_rows
+                nodes, relationships, failed = future.result()
+                nodes_created += nodes
+                relationships_created += relationships
+                failed_rows += failed
+            
+            def submit(shard: int):
+                if inflight[shard] is not None:
+                    collect(inflight[shard])
+                group = buffers[shard]
+                if sort_key:
+                    group.sort(key=sort_key)
+                inflight[shard] = executor.submit(self._write_group, query, group, dataset_name)
+                buffers[shard] = []
+            
+            for i, row in enumerate(rows):
+                shard = hash(shard_key(row)) % workers if shard_key else i % workers
+                buffers[shard].append(row)
+                if len(buffers[shard]) >= group_size:
+                    submit(shard)
+            
+            for shard in range(workers):
+                if buffers[shard]:
+                    submit(shard)
+            for future in inflight:
+                if future is not None:
+                    collect(future)
+        
+        return nodes_created, relationships_created, failed_rows
+    
+    def _ingest_rows_apoc(self, query: str, rows: List[Dict], dataset_name: str) -> Tuple[int, int, int]:
+        """Send all rows in one call and let apoc.periodic.iterate commit them server-side in batches"""
+        logger.info(f"Ingesting {len(rows)} rows via apoc.periodic.iterate (batch size {self.batch_size})")
+        with self._session() as session:
+            record = session.run(
+                _APOC_ITERATE_CYPHER,
+                action=query[len(_UNWIND_ROWS):],
+                batch_size=self.batch_size,
+                rows=rows,
+                dataset=dataset_name
+            ).single()
+        
+        if record["failedBatches"]:
+            logger.warning(f"apoc.periodic.iterate: {record['failedBatches']} batches failed: {record['errorMessages']}")
+        stats = record["updateStatistics"] or {}
+        return stats.get("nodesCreated", 0), stats.get("relationshipsCreated", 0), record["failedOperations"] or 0
+    
+    def _write_group(self, query: str, rows: List[Dict], dataset_name: str) -> Tuple[int, int, int]:
+        """Write rows in one managed transaction on a worker session; returns (nodes, relationships, failed_rows)"""
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+        try:
+            # Sessions are not thread-safe, so every write opens its own; execute_write retries transient errors
+            with self._session() as session:
+                nodes_created, relationships_created = session.execute_write(
+                    self._run_batches, query, batches, dataset_name
+                )
+            return nodes_created, relationships_created, 0
+        except Exception as e:
+            logger.warning(f"Error writing transaction of {len(batches)} batches ({len(rows)} rows): {e}")
+            return 0, 0, len(rows)
+    
+    @staticmethod
+    def _run_batches(tx, query: str, batches: List[List[Dict]], dataset_name: str) -> Tuple[int, int]:
+        """Transaction function running each UNWIND batch in turn; returns (nodes, relationships) created"""
+        nodes_created = 0
+        relationships_created = 0
+        for batch in batches:
+            counters = tx.run(query, rows=batch, dataset=dataset_name).consume().counters
+            nodes_created += counters.nodes_created
+            relationships_created += counters.relationships_created
+        return nodes_created, relationships_created
 
 
 def load_graph_to_neo4j(
@@ -275,7 +972,8 @@ def load_graph_to_neo4j(
     user: str,
     password: str,
     database: str = "neo4j",
-    clear_existing: bool = True
+    clear_existing: bool = True,
+    use_apoc: bool = False
 ) -> Optional[Dict]:
     """
     Convenience function to load a graph into Neo4j
@@ -288,6 +986,7 @@ def load_graph_to_neo4j(
         password: Neo4j password
         database: Neo4j database name
         clear_existing: Whether to clear existing data
+        use_apoc: Use apoc.periodic.iterate for very large ingests
         
     Returns:
         Dict with load stats or None on failure
@@ -298,7 +997,7 @@ def load_graph_to_neo4j(
         if not loader.connect():
             return None
         
-        stats = loader.load_graph_from_json(graph_path, dataset_name, clear_existing)
+        stats = loader.load_graph_from_json(graph_path, dataset_name, clear_existing, use_apoc)
         return stats
     except Exception as e:
         logger.error(f"Failed to load graph to Neo4j: {e}", exc_info=True)